@@ -5,35 +5,144 @@ Usage: python batch_processor.py [input_directory] [options]
 """
 
 import argparse
+import json
 import os
 import sys
 from pathlib import Path
 import logging
-from typing import List
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Iterator, List, Mapping, Optional, Tuple
+
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
 
 # Import the VideoProcessor from main app
 from app import VideoProcessor
 
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm', '.m4v', '.flv')
+LISTING_CACHE = Path('.batch_cache.json')
+
 def setup_logging(verbose: bool = False):
     """Setup logging configuration"""
     level = logging.DEBUG if verbose else logging.INFO
+    # Log to stderr (line-buffered even when redirected), keeping stdout for the JSON summary
     logging.basicConfig(
         level=level,
+        stream=sys.stderr,
         format='%(asctime)s - %(levelname)s - %(message)s',
         datefmt='%H:%M:%S'
     )
 
-def find_video_files(directory: Path) -> List[Path]:
-    """Find all video files in directory"""
-    video_extensions = {'.mp4', '.avi', '.mov', '.mkv', '.webm', '.m4v', '.flv'}
+def _ranged_int(lo: int, hi: int):
+    """argparse type that accepts an integer in [lo, hi]"""
+    def parse(value: str) -> int:
+        try:
+            number = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+        if not lo <= number <= hi:
+            raise argparse.ArgumentTypeError(f"must be between {lo} and {hi}")
+        return number
+    return parse
+
+def _scandir_recursive(path, dir_mtimes: Optional[dict] = None) -> Iterator[os.DirEntry]:
+    """Yield file entries under path; DirEntry type checks reuse the data scandir already read.
+    
+    If dir_mtimes is given, the mtime of every subdirectory walked is recorded in it.
+    """
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if dir_mtimes is not None:
+                    dir_mtimes[entry.path] = entry.stat(follow_symlinks=False).st_mtime_ns
+                yield from _scandir_recursive(entry.path, dir_mtimes)
+            elif entry.is_file():
+                yield entry
+
+def find_video_files(directory: Path, dir_mtimes: Optional[dict] = None) -> List[Tuple[Path, int, int]]:
+    """Find all video files in directory as (path, size in bytes, mtime in ns) tuples"""
     video_files = []
+    if dir_mtimes is not None:
+        dir_mtimes[str(directory)] = os.stat(directory).st_mtime_ns
     
-    for file_path in directory.rglob('*'):
-        if file_path.is_file() and file_path.suffix.lower() in video_extensions:
-            video_files.append(file_path)
+    for entry in _scandir_recursive(directory, dir_mtimes):
+        if entry.name.lower().endswith(VIDEO_EXTENSIONS):
+            stat = entry.stat()
+            video_files.append((Path(entry.path), stat.st_size, stat.st_mtime_ns))
     
     return sorted(video_files)
 
+PREFETCH_HEAD_BYTES = 1 << 20
+_prefetch_buf = bytearray(PREFETCH_HEAD_BYTES)
+
+def _prefetch(path: str):
+    """Start pulling a file into the page cache before a worker opens it"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            if hasattr(os, 'posix_fadvise'):
+                # Asynchronous readahead of the whole file
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            else:
+                # No readahead hint here (e.g. macOS): read the container header and first
+                # frames so the decoder's first reads hit the cache
+                os.readv(fd, [_prefetch_buf])
+        finally:
+            os.close(fd)
+    except OSError:
+        pass  # Prefetch is only a hint
+
+def _load_listing_cache() -> dict:
+    """Read the listing cache, keyed by resolved input directory"""
+    try:
+        return json.loads(LISTING_CACHE.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+def _save_listing_cache(cache: dict):
+    """Write the listing cache back; a failed write only costs a rescan next run"""
+    try:
+        LISTING_CACHE.write_text(json.dumps(cache))
+    except OSError as e:
+        logging.getLogger(__name__).warning("Could not write listing cache: %s", e)
+
+def _listing_is_current(listing: dict) -> bool:
+    """True if no directory in a cached listing has been modified since it was taken"""
+    try:
+        return all(os.stat(path).st_mtime_ns == mtime for path, mtime in listing['dirs'].items())
+    except (OSError, KeyError):
+        return False
+
+# Per-worker state, set once by _init_worker instead of being pickled with every task
+_worker_options: Mapping = MappingProxyType({})
+_worker_processor = None
+
+def _init_worker(options: dict, output_dir: str, quiet: bool = False):
+    """Pool initializer: store the shared batch settings and build this worker's VideoProcessor"""
+    global _worker_options, _worker_processor
+    _worker_options = MappingProxyType(options)
+    # One processor per worker: directory setup, encoder detection and thread sizing run
+    # once per process rather than once per video
+    _worker_processor = VideoProcessor()
+    _worker_processor.output_dir = Path(output_dir)
+    if quiet:
+        # The parent's progress bar reports per-file progress; keep warnings and errors only
+        logging.getLogger().setLevel(logging.WARNING)
+
+def _process_one(video_path: str, name: str, index: int, total: int) -> Tuple[bool, str]:
+    """Process a single video in a pool worker (module-level so it can be pickled)"""
+    logging.getLogger(__name__).info("Processing [%d/%d]: %s", index, total, name)
+    
+    try:
+        return _worker_processor.process_video(video_path, _worker_options)
+    except Exception as e:
+        return False, f"Unexpected error processing {name}: {e}"
+
 def main():
     parser = argparse.ArgumentParser(
         description='Batch process videos to create unique digital fingerprints',
@@ -63,9 +172,9 @@ Examples:
                        help='Add transparent overlay (default: disabled)')
     
     # Settings
-    parser.add_argument('--noise-intensity', type=int, default=2, choices=range(1, 6),
+    parser.add_argument('--noise-intensity', type=_ranged_int(1, 5), default=2,
                        help='Pixel noise intensity (1-5, default: 2)')
-    parser.add_argument('--crf', type=int, default=27, choices=range(18, 36),
+    parser.add_argument('--crf', type=_ranged_int(18, 35), default=27,
                        help='CRF value for re-encoding (18-35, default: 27)')
     parser.add_argument('--silence-duration', type=float, default=0.2,
                        help='Silence duration in seconds (default: 0.2)')
@@ -77,6 +186,12 @@ Examples:
                        help='Enable verbose logging')
     parser.add_argument('--dry-run', action='store_true',
                        help='Show what would be processed without actually processing')
+    parser.add_argument('--only-new', action='store_true',
+                       help='Skip videos already processed successfully by an earlier run')
+    parser.add_argument('--fail-fast', action='store_true',
+                       help='Stop queuing new videos after the first failure')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                       help='Number of videos to process concurrently (default: 1)')
     
     args = parser.parse_args()
     
@@ -94,28 +209,36 @@ Examples:
         logger.error(f"Input path is not a directory: {input_dir}")
         sys.exit(1)
     
-    # Find video files
-    video_files = find_video_files(input_dir)
+    # Find video files, reusing the previous listing if no directory under input_dir changed
+    cache = _load_listing_cache()
+    listing = cache.get(str(input_dir.resolve()))
+    if listing and _listing_is_current(listing):
+        # Unchanged directories mean no files were added or removed, but a file rewritten in
+        # place doesn't touch its directory, so each one is still stat'ed for size and mtime
+        video_files = []
+        for path, *_ in listing['files']:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            video_files.append((Path(path), stat.st_size, stat.st_mtime_ns))
+        logger.debug("Reusing cached listing for %s", input_dir)
+    else:
+        dir_mtimes = {}
+        video_files = find_video_files(input_dir, dir_mtimes)
+        listing = cache[str(input_dir.resolve())] = {
+            'dirs': dir_mtimes,
+            'files': [[str(path), size, mtime] for path, size, mtime in video_files],
+            'processed': listing.get('processed', {}) if listing else {},
+        }
+        _save_listing_cache(cache)
+    
     if not video_files:
         logger.warning(f"No video files found in {input_dir}")
         sys.exit(0)
     
     logger.info(f"Found {len(video_files)} video files")
     
-    if args.dry_run:
-        logger.info("DRY RUN - Files that would be processed:")
-        for video_file in video_files:
-            logger.info(f"  {video_file}")
-        sys.exit(0)
-    
-    # Setup processor
-    processor = VideoProcessor()
-    
-    # Override output directory if specified
-    if args.output_dir != 'output':
-        processor.output_dir = Path(args.output_dir)
-        processor.output_dir.mkdir(exist_ok=True)
-    
     # Build options dict
     options = {
         'strip_metadata': not args.no_metadata,
@@ -128,40 +251,122 @@ Examples:
         'silence_duration': args.silence_duration,
     }
     
+    # Inputs that succeeded before with the same options and output directory, unchanged since
+    # (same size and mtime)
+    run_key = json.dumps([options, str(Path(args.output_dir).resolve())], sort_keys=True)
+    processed = listing['processed'].setdefault(run_key, {})
+    if args.only_new:
+        video_files = [f for f in video_files if processed.get(str(f[0])) != [f[1], f[2]]]
+        if not video_files:
+            logger.info("No new video files to process")
+            sys.exit(0)
+        logger.info(f"{len(video_files)} of them are new")
+    
+    if args.dry_run:
+        logger.info("DRY RUN - Files that would be processed:")
+        for video_file, *_ in video_files:
+            logger.info("  %s", video_file)
+        sys.exit(0)
+    
+    # Setup output directory (each worker builds its own VideoProcessor)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(exist_ok=True)
+    
     # Log processing options
     logger.info("Processing options:")
     for key, value in options.items():
-        logger.info(f"  {key}: {value}")
+        logger.info("  %s: %s", key, value)
     
-    # Process videos
+    # Process videos in a process pool: each video's Python-side noise work runs in its own
+    # interpreter, so jobs don't contend for the GIL. Inputs are prefetched into the page cache
+    # as they're submitted, and at most two per worker are queued for back-pressure
     success_count = 0
     error_count = 0
+    skipped_count = 0
+    total = len(video_files)
+    jobs = max(1, min(args.jobs, total))
+    # Largest files first, so long jobs don't start last and leave the other workers idle
+    video_files.sort(key=itemgetter(1), reverse=True)
+    # Resolve each path to the plain strings the workers need once, then drop the Path list
+    work = iter(enumerate([(str(p), p.name, size, mtime) for p, size, mtime in video_files], 1))
+    del video_files
+    pending = {}  # future -> (path, size, mtime) of the input it is processing
+    interrupted = False
+    stopped_early = False
+    # A progress bar replaces the per-file log lines on a terminal; headless runs (e.g. under
+    # journald) keep plain logging
+    pbar = tqdm(total=total, unit='video', dynamic_ncols=True) if tqdm and sys.stderr.isatty() else None
     
-    for i, video_file in enumerate(video_files, 1):
-        logger.info(f"Processing [{i}/{len(video_files)}]: {video_file.name}")
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(options, str(output_dir), pbar is not None)) as executor:
+        def submit_more():
+            while len(pending) < jobs * 2:
+                item = next(work, None)
+                if item is None:
+                    return
+                i, (path_str, name, size, mtime) = item
+                _prefetch(path_str)
+                pending[executor.submit(_process_one, path_str, name, i, total)] = (path_str, size, mtime)
         
         try:
-            success, message = processor.process_video(str(video_file), options)
-            
-            if success:
-                success_count += 1
-                logger.info(message)
-            else:
-                error_count += 1
-                logger.error(message)
-                
+            submit_more()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    success, message = future.result()
+                    path_str, size, mtime = pending.pop(future)
+                    if success:
+                        success_count += 1
+                        processed[path_str] = [size, mtime]
+                        if pbar is None:
+                            logger.info(message)
+                    else:
+                        error_count += 1
+                        logger.error(message)
+                    if pbar is not None:
+                        pbar.set_postfix(ok=success_count, err=error_count, refresh=False)
+                        pbar.update()
+                if error_count and args.fail_fast:
+                    if not stopped_early:
+                        stopped_early = True
+                        # Drop queued jobs and never submit the rest; ones already running are left to finish
+                        running = {future: item for future, item in pending.items() if not future.cancel()}
+                        skipped_count = len(pending) - len(running) + sum(1 for _ in work)
+                        pending = running
+                        logger.error("Stopping after first failure (--fail-fast), %d video(s) skipped",
+                                     skipped_count)
+                        if pbar is not None:
+                            pbar.update(skipped_count)
+                else:
+                    submit_more()
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM-killed): the pool can't run anything else, so everything
+            # still pending or unsubmitted counts as failed
+            lost = len(pending) + sum(1 for _ in work)
+            logger.error("Worker process died, %d video(s) not processed: %s", lost, e)
+            error_count += lost
+            if pbar is not None:
+                pbar.update(lost)
         except KeyboardInterrupt:
             logger.warning("Processing interrupted by user")
-            break
-        except Exception as e:
-            error_count += 1
-            logger.error(f"Unexpected error processing {video_file.name}: {e}")
-    
-    # Summary
-    logger.info(f"\nProcessing complete:")
-    logger.info(f"  ✅ Success: {success_count}")
-    logger.info(f"  ❌ Errors: {error_count}")
-    logger.info(f"  📁 Output directory: {processor.output_dir.absolute()}")
+            interrupted = True
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    if pbar is not None:
+        pbar.close()
+    
+    if success_count:
+        _save_listing_cache(cache)
+    
+    # Summary: one machine-readable line, then exit without running atexit teardown
+    print(json.dumps({
+        "ok": success_count,
+        "err": error_count,
+        "skipped": skipped_count,
+        "out": str(output_dir.resolve()),
+    }))
+    sys.stdout.flush()
+    os._exit(130 if interrupted else 1 if error_count else 0)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -4,9 +4,8 @@ DigitalOcean-specific startup script for Streamlit app
 Optimized for DigitalOcean App Platform
 """
 import os
-import subprocess
 import sys
-import time
+from pathlib import Path
 
 def main():
     """Start the Streamlit app with DigitalOcean-optimized settings"""
@@ -48,8 +47,11 @@ caching = true
 displayEnabled = true
 """
     
-    with open(".streamlit/config.toml", "w") as f:
-        f.write(config_content)
+    # Only rewrite the config when it changed, so restart loops don't churn the file
+    config_path = Path(".streamlit/config.toml")
+    config_bytes = config_content.encode()
+    if not config_path.exists() or config_path.read_bytes() != config_bytes:
+        config_path.write_bytes(config_bytes)
     
     # Build the streamlit command optimized for DigitalOcean with large file support
     cmd = [
@@ -70,15 +72,14 @@ displayEnabled = true
     print(f"💾 Available memory: Better than Railway!")
     print(f"📁 Max upload size: 500MB")
     
-    # Start the app
+    # Replace this process with Streamlit so no idle Python parent stays resident
+    # and signals from the platform reach Streamlit directly
+    sys.stdout.flush()
     try:
-        subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError as e:
+        os.execvp(cmd[0], cmd)
+    except OSError as e:
         print(f"❌ Failed to start Streamlit: {e}")
         sys.exit(1)
-    except KeyboardInterrupt:
-        print("🛑 Shutting down...")
-        sys.exit(0)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -8,6 +8,14 @@ import subprocess
 import sys
 import time
 
+def _is_current(path, content):
+    """Return True if the file at path already holds exactly this content"""
+    try:
+        with open(path, "rb") as f:
+            return f.read() == content.encode()
+    except OSError:
+        return False
+
 def install_system_dependencies():
     """Install system dependencies for video processing"""
     print("🔧 Installing system dependencies...")
@@ -61,6 +69,11 @@ server {
     client_body_timeout 300s;
     client_header_timeout 300s;
     
+    # Kernel-side file transfer for anything nginx serves itself
+    sendfile on;
+    tcp_nopush on;
+    tcp_nodelay on;
+    
     location / {
         proxy_pass http://127.0.0.1:8501;
         proxy_set_header Host $host;
@@ -87,21 +100,21 @@ server {
 }
 """
     
-    # Write Nginx config
-    with open("/tmp/video-processor", "w") as f:
-        f.write(nginx_config)
-    
-    # Move to sites-available and enable
-    subprocess.run(["sudo", "mv", "/tmp/video-processor", "/etc/nginx/sites-available/"], check=True)
-    subprocess.run(["sudo", "ln", "-sf", "/etc/nginx/sites-available/video-processor", "/etc/nginx/sites-enabled/"], check=True)
-    
-    # Remove default site
-    subprocess.run(["sudo", "rm", "-f", "/etc/nginx/sites-enabled/default"], check=True)
-    
-    # Test and restart Nginx
-    subprocess.run(["sudo", "nginx", "-t"], check=True)
-    subprocess.run(["sudo", "systemctl", "restart", "nginx"], check=True)
-    subprocess.run(["sudo", "systemctl", "enable", "nginx"], check=True)
+    # Install, enable, test and restart in one privileged shell instead of one sudo per step;
+    # the config is only moved into place when the installed copy isn't already current
+    steps = []
+    if not _is_current("/etc/nginx/sites-available/video-processor", nginx_config):
+        with open("/tmp/video-processor", "w") as f:
+            f.write(nginx_config)
+        steps.append("mv /tmp/video-processor /etc/nginx/sites-available/")
+    steps += [
+        "ln -sf /etc/nginx/sites-available/video-processor /etc/nginx/sites-enabled/",
+        "rm -f /etc/nginx/sites-enabled/default",
+        "nginx -t",
+        "systemctl restart nginx",
+        "systemctl enable nginx",
+    ]
+    subprocess.run(["sudo", "bash", "-c", " && ".join(steps)], check=True)
     
     print("✅ Nginx configured")
 
@@ -132,13 +145,13 @@ RestartSec=3
 WantedBy=multi-user.target
 """
     
-    # Write service file
-    with open("/tmp/video-processor.service", "w") as f:
-        f.write(service_content)
+    # Write and install service file; daemon-reload is only needed when it changed
+    if not _is_current("/etc/systemd/system/video-processor.service", service_content):
+        with open("/tmp/video-processor.service", "w") as f:
+            f.write(service_content)
+        subprocess.run(["sudo", "mv", "/tmp/video-processor.service", "/etc/systemd/system/"], check=True)
+        subprocess.run(["sudo", "systemctl", "daemon-reload"], check=True)
     
-    # Install service
-    subprocess.run(["sudo", "mv", "/tmp/video-processor.service", "/etc/systemd/system/"], check=True)
-    subprocess.run(["sudo", "systemctl", "daemon-reload"], check=True)
     subprocess.run(["sudo", "systemctl", "enable", "video-processor"], check=True)
     
     print("✅ Systemd service created")
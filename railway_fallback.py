@@ -5,16 +5,18 @@ Railway fallback startup script with enhanced debugging
 import os
 import subprocess
 import sys
-import time
 import socket
+from importlib import metadata
 
 def check_port_available(port):
-    """Check if port is available"""
+    """Check if port is available (nothing is listening on it locally)"""
+    # Probe with a connect instead of binding, so the check can't hold the port or leave it
+    # in TIME_WAIT right before Streamlit binds it
     try:
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.bind(('', int(port)))
-            return True
-    except:
+            s.settimeout(0.1)
+            return s.connect_ex(('127.0.0.1', int(port))) != 0
+    except (OSError, ValueError):
         return False
 
 def main():
@@ -44,12 +46,12 @@ def main():
         except Exception as e:
             print(f"❌ Failed to create {dir_name}/: {e}")
     
-    # Check if streamlit is available
+    # Check if streamlit is available (package metadata, no interpreter spawn)
     print("\n🔍 Checking Streamlit installation...")
     try:
-        result = subprocess.run(['streamlit', '--version'], capture_output=True, text=True)
-        print(f"✅ Streamlit version: {result.stdout.strip()}")
-    except Exception as e:
+        streamlit_version = metadata.version("streamlit")
+        print(f"✅ Streamlit version: {streamlit_version}")
+    except metadata.PackageNotFoundError as e:
         print(f"❌ Streamlit not found: {e}")
         sys.exit(1)
     
@@ -60,64 +62,47 @@ def main():
         print("❌ app.py not found!")
         sys.exit(1)
     
-    # Try multiple startup methods
-    startup_methods = [
-        # Method 1: Full configuration
-        [
-            "streamlit", "run", "app.py",
-            "--server.port", port,
-            "--server.address", "0.0.0.0",
-            "--server.headless", "true",
-            "--server.enableCORS", "false",
-            "--server.enableXsrfProtection", "false",
-            "--browser.gatherUsageStats", "false"
-        ],
-        # Method 2: Minimal configuration
-        [
-            "streamlit", "run", "app.py",
-            "--server.port", port,
-            "--server.address", "0.0.0.0",
-            "--server.headless", "true"
-        ],
-        # Method 3: Default Railway method
-        [
-            "streamlit", "run", "app.py"
-        ]
+    # Full configuration first; if Streamlit exits with an error (e.g. a flag this version
+    # rejects), fall back to the minimal command in place
+    minimal_cmd = [
+        "streamlit", "run", "app.py",
+        "--server.port", port,
+        "--server.address", "0.0.0.0",
+        "--server.headless", "true"
+    ]
+    full_cmd = minimal_cmd + [
+        "--server.enableCORS", "false",
+        "--server.enableXsrfProtection", "false",
+        "--browser.gatherUsageStats", "false"
     ]
     
-    for i, cmd in enumerate(startup_methods, 1):
-        print(f"\n🚀 Trying startup method {i}...")
-        print(f"📍 Command: {' '.join(cmd)}")
-        
-        try:
-            # Set environment variables for this attempt
-            env = os.environ.copy()
-            env['STREAMLIT_SERVER_PORT'] = port
-            env['STREAMLIT_SERVER_ADDRESS'] = '0.0.0.0'
-            env['STREAMLIT_SERVER_HEADLESS'] = 'true'
-            
-            # Start the process
-            process = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-            
-            # Wait a few seconds and check if it's still running
-            time.sleep(3)
-            if process.poll() is None:  # Still running
-                print(f"✅ Method {i} appears to be working!")
-                # Continue running
-                process.wait()
-                break
-            else:
-                print(f"❌ Method {i} failed quickly")
-                if process.stdout:
-                    output = process.stdout.read()
-                    print(f"Output: {output}")
-                    
-        except Exception as e:
-            print(f"❌ Method {i} failed: {e}")
-            continue
+    os.environ['STREAMLIT_SERVER_PORT'] = port
+    os.environ['STREAMLIT_SERVER_ADDRESS'] = '0.0.0.0'
+    os.environ['STREAMLIT_SERVER_HEADLESS'] = 'true'
+    
+    print(f"\n🚀 Starting Streamlit (full configuration)...")
+    print(f"📍 Command: {' '.join(full_cmd)}")
+    sys.stdout.flush()
+    
+    try:
+        returncode = subprocess.run(full_cmd).returncode
+    except OSError as e:
+        print(f"❌ Failed to start Streamlit: {e}")
+        sys.exit(1)
+    if returncode == 0:
+        sys.exit(0)
+    
+    print(f"❌ Full configuration exited with code {returncode}")
+    print(f"\n🚀 Falling back to minimal configuration...")
+    print(f"📍 Command: {' '.join(minimal_cmd)}")
+    sys.stdout.flush()
     
-    print("❌ All startup methods failed!")
-    sys.exit(1)
+    # Replace this process with Streamlit; exec only returns if it couldn't start
+    try:
+        os.execvp(minimal_cmd[0], minimal_cmd)
+    except OSError as e:
+        print(f"❌ Failed to start Streamlit: {e}")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -3,7 +3,6 @@
 Simple Railway startup script - follows Railway web service patterns
 """
 import os
-import subprocess
 import sys
 
 def main():
@@ -37,8 +36,13 @@ def main():
     
     print(f"📍 Command: {' '.join(cmd)}")
     
-    # Execute
-    subprocess.run(cmd)
+    # Execute (replaces this process, so Streamlit gets the platform's signals directly)
+    sys.stdout.flush()
+    try:
+        os.execvp(cmd[0], cmd)
+    except OSError as e:
+        print(f"❌ Failed to start Streamlit: {e}")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -3,9 +3,7 @@
 Railway-specific startup script for Streamlit app
 """
 import os
-import subprocess
 import sys
-import time
 
 def main():
     """Start the Streamlit app with Railway-optimized settings"""
@@ -36,15 +34,14 @@ def main():
     print(f"🚀 Starting Streamlit on Railway (port {port})...")
     print(f"📍 Command: {' '.join(cmd)}")
     
-    # Start the app
+    # Replace this process with Streamlit so no idle Python parent stays resident
+    # and signals from the platform reach Streamlit directly
+    sys.stdout.flush()
     try:
-        subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError as e:
+        os.execvp(cmd[0], cmd)
+    except OSError as e:
         print(f"❌ Failed to start Streamlit: {e}")
         sys.exit(1)
-    except KeyboardInterrupt:
-        print("🛑 Shutting down...")
-        sys.exit(0)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
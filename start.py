@@ -3,7 +3,6 @@
 Production startup script for Railway deployment
 """
 import os
-import subprocess
 import sys
 
 def main():
@@ -20,7 +19,12 @@ def main():
     ]
     
     print(f"Starting Streamlit on port {port}...")
-    subprocess.run(cmd)
+    sys.stdout.flush()
+    try:
+        os.execvp(cmd[0], cmd)
+    except OSError as e:
+        print(f"Failed to start Streamlit: {e}")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
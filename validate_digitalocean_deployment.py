@@ -4,9 +4,25 @@ Pre-deployment validation script for DigitalOcean
 Checks if all dependencies and configurations are ready
 """
 import os
+import re
 import sys
 import subprocess
-from pathlib import Path
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def read_config(path):
+    """Read a config file once; later checks reuse the same contents"""
+    with open(path, 'r') as f:
+        return f.read()
+
+@lru_cache(maxsize=None)
+def list_dir(path='.'):
+    """Names in a directory from one scandir pass, shared by all checks (empty if missing)"""
+    try:
+        with os.scandir(path) as entries:
+            return frozenset(entry.name for entry in entries)
+    except OSError:
+        return frozenset()
 
 def check_required_files():
     """Check if all required files exist"""
@@ -21,7 +37,8 @@ def check_required_files():
     
     missing_files = []
     for file_path in required_files:
-        if not Path(file_path).exists():
+        directory, _, name = file_path.rpartition('/')
+        if name not in list_dir(directory or '.'):
             missing_files.append(file_path)
     
     if missing_files:
@@ -36,8 +53,7 @@ def check_required_files():
 def validate_app_yaml():
     """Validate .do/app.yaml configuration"""
     try:
-        with open('.do/app.yaml', 'r') as f:
-            content = f.read()
+        content = read_config('.do/app.yaml')
         
         required_configs = [
             'dockerfile_path: Dockerfile.digitalocean',
@@ -47,10 +63,7 @@ def validate_app_yaml():
             'PLATFORM'
         ]
         
-        missing_configs = []
-        for config in required_configs:
-            if config not in content:
-                missing_configs.append(config)
+        missing_configs = [config for config in required_configs if config not in content]
         
         if missing_configs:
             print("❌ Missing configurations in .do/app.yaml:")
@@ -68,8 +81,7 @@ def validate_app_yaml():
 def validate_dockerfile():
     """Validate Dockerfile.digitalocean"""
     try:
-        with open('Dockerfile.digitalocean', 'r') as f:
-            content = f.read()
+        content = read_config('Dockerfile.digitalocean')
         
         required_components = [
             'FROM python:3.11.7-slim',
@@ -80,10 +92,7 @@ def validate_dockerfile():
             'digitalocean_start.py'
         ]
         
-        missing_components = []
-        for component in required_components:
-            if component not in content:
-                missing_components.append(component)
+        missing_components = [component for component in required_components if component not in content]
         
         if missing_components:
             print("❌ Missing components in Dockerfile.digitalocean:")
@@ -101,8 +110,7 @@ def validate_dockerfile():
 def validate_requirements():
     """Validate requirements.txt has all necessary packages"""
     try:
-        with open('requirements.txt', 'r') as f:
-            content = f.read()
+        content = read_config('requirements.txt')
         
         required_packages = [
             'streamlit>=1.28.0',
@@ -112,11 +120,16 @@ def validate_requirements():
             'python-multipart'
         ]
         
-        missing_packages = []
-        for package in required_packages:
-            package_name = package.split('>=')[0].split('==')[0]
-            if package_name not in content:
-                missing_packages.append(package)
+        # Set of package names declared in requirements.txt, for O(1) lookups
+        declared = {
+            re.split(r'[<>=!~\[;\s]', line, maxsplit=1)[0].lower()
+            for line in content.splitlines()
+            if line.strip() and not line.lstrip().startswith('#')
+        }
+        missing_packages = [
+            package for package in required_packages
+            if package.split('>=')[0].split('==')[0].lower() not in declared
+        ]
         
         if missing_packages:
             print("❌ Missing packages in requirements.txt:")
@@ -136,13 +149,12 @@ def check_potential_conflicts():
     warnings = []
     
     # Check if nixpacks.toml might interfere (just a warning, not a failure)
-    if Path('nixpacks.toml').exists():
+    if 'nixpacks.toml' in list_dir():
         warnings.append("nixpacks.toml exists (Railway-specific, won't affect DigitalOcean Docker deployment)")
     
     # Check if there are multiple Dockerfiles (acceptable if they're platform-specific)
-    dockerfiles = list(Path('.').glob('Dockerfile*'))
-    if len(dockerfiles) > 1:
-        dockerfile_names = [f.name for f in dockerfiles]
+    dockerfile_names = sorted(name for name in list_dir() if name.startswith('Dockerfile'))
+    if len(dockerfile_names) > 1:
         if 'Dockerfile.digitalocean' in dockerfile_names:
             warnings.append(f"Multiple Dockerfiles found: {dockerfile_names} (acceptable for multi-platform deployment)")
         else: